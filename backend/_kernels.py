@@ -0,0 +1,67 @@
+"""
+Numba-compiled gate kernels for the quantum processor
+Applies gates in place on a flat complex128 statevector using bit masks
+"""
+
+import numpy as np
+from numba import njit
+
+# Flat statevector indexing is little-endian: bit k of an amplitude's
+# index is the state of qubit k, so qubit k pairs amplitudes at distance
+# stride = 1 << k. cache=True persists the compiled kernels to disk so
+# the Flask server does not pay JIT time on every cold start.
+#
+# The loops are deliberately serial: parallel=True's threading runtime
+# deadlocks at interpreter shutdown when the kernels are invoked from
+# multiple gunicorn worker threads, and the serial bit-mask loops are
+# already well ahead of the NumPy path at the register sizes served here.
+#
+# Callers must validate qubit indices before invoking these — the loops
+# run without bounds checks.
+
+@njit(cache=True)
+def apply_1q(psi, qubit, matrix):
+    """
+    Apply a 2x2 gate matrix to one qubit of a flat statevector in place
+
+    Iterates the 2^(n-1) amplitude pairs (i, i | stride); each pair is
+    touched by exactly one loop iteration.
+    """
+    stride = 1 << qubit
+    half = psi.shape[0] >> 1
+    u00, u01 = matrix[0, 0], matrix[0, 1]
+    u10, u11 = matrix[1, 0], matrix[1, 1]
+
+    for h in range(half):
+        # Insert a zero bit at position `qubit` to get the pair's base index
+        i0 = ((h >> qubit) << (qubit + 1)) | (h & (stride - 1))
+        i1 = i0 | stride
+        a = psi[i0]
+        b = psi[i1]
+        psi[i0] = u00 * a + u01 * b
+        psi[i1] = u10 * a + u11 * b
+
+@njit(cache=True)
+def apply_cx(psi, control, target):
+    """
+    Apply a CNOT gate in place by swapping amplitudes where the control
+    bit is 1, pairing each index with its target-bit complement
+    """
+    target_bit = 1 << target
+
+    for i in range(psi.shape[0]):
+        if (i >> control) & 1 == 1 and i & target_bit == 0:
+            j = i | target_bit
+            tmp = psi[i]
+            psi[i] = psi[j]
+            psi[j] = tmp
+
+@njit(cache=True)
+def apply_cz(psi, control, target):
+    """
+    Apply a CZ gate in place by negating amplitudes where both the
+    control and target bits are 1
+    """
+    for i in range(psi.shape[0]):
+        if (i >> control) & 1 == 1 and (i >> target) & 1 == 1:
+            psi[i] = -psi[i]
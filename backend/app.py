@@ -1,217 +1,292 @@
-"""
-Flask API for Quantum State Visualizer
-Provides endpoints for quantum circuit processing and state visualization
-"""
-
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from quantum_processor import QuantumStateProcessor
-import json
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend communication
-
-# Initialize quantum processor
-quantum_processor = QuantumStateProcessor()
-
-@app.route('/', methods=['GET'])
-def home():
-    """Health check endpoint"""
-    return jsonify({
-        'message': 'Quantum State Visualizer API',
-        'status': 'running',
-        'version': '1.0.0'
-    })
-
-@app.route('/api/process-circuit', methods=['POST'])
-def process_circuit():
-    """
-    Process a quantum circuit and return Bloch sphere coordinates
-    
-    Expected JSON payload:
-    {
-        "num_qubits": 2,
-        "gates": [
-            {"type": "h", "qubit": 0},
-            {"type": "cx", "control": 0, "target": 1}
-        ]
-    }
-    
-    Returns:
-    {
-        "num_qubits": 2,
-        "qubits": [
-            {
-                "index": 0,
-                "bloch_coordinates": {"x": 0.0, "y": 0.0, "z": 0.0},
-                "density_matrix": [[...], [...]]
-            },
-            ...
-        ]
-    }
-    """
-    try:
-        # Get circuit data from request
-        circuit_data = request.get_json()
-        
-        if not circuit_data:
-            return jsonify({'error': 'No circuit data provided'}), 400
-        
-        # Validate required fields
-        if 'num_qubits' not in circuit_data:
-            return jsonify({'error': 'num_qubits field is required'}), 400
-        
-        if 'gates' not in circuit_data:
-            circuit_data['gates'] = []  # Empty circuit is valid
-        
-        # Process the circuit
-        result = quantum_processor.process_circuit(circuit_data)
-        
-        if 'error' in result:
-            return jsonify(result), 500
-        
-        return jsonify(result)
-    
-    except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
-
-@app.route('/api/example-circuits', methods=['GET'])
-def get_example_circuits():
-    """
-    Get predefined example circuits for demonstration
-    """
-    examples = {
-        'bell_state': {
-            'name': 'Bell State (Entangled Qubits)',
-            'description': 'Creates maximum entanglement between two qubits',
-            'circuit': {
-                'num_qubits': 2,
-                'gates': [
-                    {'type': 'h', 'qubit': 0},
-                    {'type': 'cx', 'control': 0, 'target': 1}
-                ]
-            }
-        },
-        'ghz_state': {
-            'name': 'GHZ State (3 Qubits)',
-            'description': 'Three-qubit entangled state',
-            'circuit': {
-                'num_qubits': 3,
-                'gates': [
-                    {'type': 'h', 'qubit': 0},
-                    {'type': 'cx', 'control': 0, 'target': 1},
-                    {'type': 'cx', 'control': 1, 'target': 2}
-                ]
-            }
-        },
-        'superposition': {
-            'name': 'Single Qubit Superposition',
-            'description': 'Single qubit in equal superposition',
-            'circuit': {
-                'num_qubits': 1,
-                'gates': [
-                    {'type': 'h', 'qubit': 0}
-                ]
-            }
-        },
-        'mixed_state': {
-            'name': 'Mixed State Example',
-            'description': 'Creates mixed states through partial measurement',
-            'circuit': {
-                'num_qubits': 2,
-                'gates': [
-                    {'type': 'h', 'qubit': 0},
-                    {'type': 'h', 'qubit': 1},
-                    {'type': 'cx', 'control': 0, 'target': 1}
-                ]
-            }
-        }
-    }
-    
-    return jsonify(examples)
-
-@app.route('/api/supported-gates', methods=['GET'])
-def get_supported_gates():
-    """
-    Get list of supported quantum gates
-    """
-    gates = {
-        'single_qubit': [
-            {
-                'type': 'h',
-                'name': 'Hadamard',
-                'description': 'Creates superposition',
-                'parameters': ['qubit']
-            },
-            {
-                'type': 'x',
-                'name': 'Pauli-X',
-                'description': 'Bit flip gate',
-                'parameters': ['qubit']
-            },
-            {
-                'type': 'y',
-                'name': 'Pauli-Y',
-                'description': 'Bit and phase flip gate',
-                'parameters': ['qubit']
-            },
-            {
-                'type': 'z',
-                'name': 'Pauli-Z',
-                'description': 'Phase flip gate',
-                'parameters': ['qubit']
-            },
-            {
-                'type': 'rx',
-                'name': 'Rotation-X',
-                'description': 'Rotation around X-axis',
-                'parameters': ['qubit', 'angle']
-            },
-            {
-                'type': 'ry',
-                'name': 'Rotation-Y',
-                'description': 'Rotation around Y-axis',
-                'parameters': ['qubit', 'angle']
-            },
-            {
-                'type': 'rz',
-                'name': 'Rotation-Z',
-                'description': 'Rotation around Z-axis',
-                'parameters': ['qubit', 'angle']
-            }
-        ],
-        'two_qubit': [
-            {
-                'type': 'cx',
-                'name': 'CNOT',
-                'description': 'Controlled-X gate',
-                'parameters': ['control', 'target']
-            },
-            {
-                'type': 'cz',
-                'name': 'Controlled-Z',
-                'description': 'Controlled-Z gate',
-                'parameters': ['control', 'target']
-            }
-        ]
-    }
-    
-    return jsonify(gates)
-
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
-
-if __name__ == '__main__':
-    print("Starting Quantum State Visualizer API...")
-    print("Available endpoints:")
-    print("  GET  /                     - Health check")
-    print("  POST /api/process-circuit  - Process quantum circuit")
-    print("  GET  /api/example-circuits - Get example circuits")
-    print("  GET  /api/supported-gates  - Get supported gates")
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+"""
+Flask API for Quantum State Visualizer
+Provides endpoints for quantum circuit processing and state visualization
+"""
+
+from flask import Flask, Response, request
+from quantum_processor import QuantumStateProcessor
+import functools
+import json
+import orjson
+import os
+
+app = Flask(__name__)
+
+@app.after_request
+def add_cors_headers(response):
+    """
+    Attach static CORS headers for frontend communication
+
+    Replaces Flask-CORS's per-request regex matching with three fixed
+    header writes.
+    """
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET,POST,OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    return response
+
+# Initialize quantum processor
+quantum_processor = QuantumStateProcessor()
+
+def ojsonify(data, status=200):
+    """
+    Serialize a response payload with orjson
+
+    Drop-in replacement for Flask's jsonify: orjson is several times
+    faster than the standard library encoder and serializes NumPy arrays
+    natively via OPT_SERIALIZE_NUMPY.
+    """
+    return Response(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+                    status=status, mimetype='application/json')
+
+def canonical_circuit_json(circuit_data):
+    """
+    Serialize circuit data to a canonical JSON string for cache keying
+
+    Keys are sorted and float angles are rounded to 12 decimals so
+    semantically-equal circuits map to the same cache entry.
+    """
+    def round_floats(value):
+        if isinstance(value, float):
+            return round(value, 12)
+        if isinstance(value, dict):
+            return {k: round_floats(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [round_floats(v) for v in value]
+        return value
+
+    return json.dumps(round_floats(circuit_data), sort_keys=True)
+
+@functools.lru_cache(maxsize=512)
+def process_circuit_cached(canonical_json, include_density):
+    """
+    LRU-cached wrapper around the quantum processor
+
+    The simulator is deterministic, so repeated POSTs of the same circuit
+    (e.g. the example circuits from the frontend) are O(1) cache hits.
+    """
+    return quantum_processor.process_circuit(json.loads(canonical_json),
+                                             include_density=include_density)
+
+@app.route('/', methods=['GET'])
+def home():
+    """Health check endpoint"""
+    return ojsonify({
+        'message': 'Quantum State Visualizer API',
+        'status': 'running',
+        'version': '1.0.0'
+    })
+
+@app.route('/api/process-circuit', methods=['OPTIONS'])
+def process_circuit_preflight():
+    """CORS preflight: answer immediately, headers come from after_request"""
+    return Response(status=204)
+
+@app.route('/api/process-circuit', methods=['POST'])
+def process_circuit():
+    """
+    Process a quantum circuit and return Bloch sphere coordinates
+    
+    Expected JSON payload:
+    {
+        "num_qubits": 2,
+        "gates": [
+            {"type": "h", "qubit": 0},
+            {"type": "cx", "control": 0, "target": 1}
+        ]
+    }
+    
+    Returns:
+    {
+        "num_qubits": 2,
+        "qubits": [
+            {
+                "index": 0,
+                "bloch_coordinates": {"x": 0.0, "y": 0.0, "z": 0.0},
+                "density_matrix": [[...], [...]]  # only with ?with_density=1
+            },
+            ...
+        ]
+    }
+    """
+    try:
+        # Get circuit data from request
+        circuit_data = request.get_json()
+        
+        if not circuit_data:
+            return ojsonify({'error': 'No circuit data provided'}, 400)
+        
+        # Validate required fields
+        if 'num_qubits' not in circuit_data:
+            return ojsonify({'error': 'num_qubits field is required'}, 400)
+        
+        if 'gates' not in circuit_data:
+            circuit_data['gates'] = []  # Empty circuit is valid
+        
+        # Density matrices are opt-in (?with_density=1); the frontend only
+        # consumes the Bloch coordinates
+        with_density = request.args.get('with_density') in ('1', 'true')
+
+        # Process the circuit (cached on the canonical payload)
+        result = process_circuit_cached(canonical_circuit_json(circuit_data),
+                                        with_density)
+        
+        if 'error' in result:
+            return ojsonify(result, 500)
+        
+        return ojsonify(result)
+    
+    except Exception as e:
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
+
+# Static endpoint payloads, built and serialized once at import time so
+# the handlers skip dict construction and serialization on every GET
+EXAMPLE_CIRCUITS = {
+    'bell_state': {
+        'name': 'Bell State (Entangled Qubits)',
+        'description': 'Creates maximum entanglement between two qubits',
+        'circuit': {
+            'num_qubits': 2,
+            'gates': [
+                {'type': 'h', 'qubit': 0},
+                {'type': 'cx', 'control': 0, 'target': 1}
+            ]
+        }
+    },
+    'ghz_state': {
+        'name': 'GHZ State (3 Qubits)',
+        'description': 'Three-qubit entangled state',
+        'circuit': {
+            'num_qubits': 3,
+            'gates': [
+                {'type': 'h', 'qubit': 0},
+                {'type': 'cx', 'control': 0, 'target': 1},
+                {'type': 'cx', 'control': 1, 'target': 2}
+            ]
+        }
+    },
+    'superposition': {
+        'name': 'Single Qubit Superposition',
+        'description': 'Single qubit in equal superposition',
+        'circuit': {
+            'num_qubits': 1,
+            'gates': [
+                {'type': 'h', 'qubit': 0}
+            ]
+        }
+    },
+    'mixed_state': {
+        'name': 'Mixed State Example',
+        'description': 'Creates mixed states through partial measurement',
+        'circuit': {
+            'num_qubits': 2,
+            'gates': [
+                {'type': 'h', 'qubit': 0},
+                {'type': 'h', 'qubit': 1},
+                {'type': 'cx', 'control': 0, 'target': 1}
+            ]
+        }
+    }
+}
+
+SUPPORTED_GATES = {
+    'single_qubit': [
+        {
+            'type': 'h',
+            'name': 'Hadamard',
+            'description': 'Creates superposition',
+            'parameters': ['qubit']
+        },
+        {
+            'type': 'x',
+            'name': 'Pauli-X',
+            'description': 'Bit flip gate',
+            'parameters': ['qubit']
+        },
+        {
+            'type': 'y',
+            'name': 'Pauli-Y',
+            'description': 'Bit and phase flip gate',
+            'parameters': ['qubit']
+        },
+        {
+            'type': 'z',
+            'name': 'Pauli-Z',
+            'description': 'Phase flip gate',
+            'parameters': ['qubit']
+        },
+        {
+            'type': 'rx',
+            'name': 'Rotation-X',
+            'description': 'Rotation around X-axis',
+            'parameters': ['qubit', 'angle']
+        },
+        {
+            'type': 'ry',
+            'name': 'Rotation-Y',
+            'description': 'Rotation around Y-axis',
+            'parameters': ['qubit', 'angle']
+        },
+        {
+            'type': 'rz',
+            'name': 'Rotation-Z',
+            'description': 'Rotation around Z-axis',
+            'parameters': ['qubit', 'angle']
+        }
+    ],
+    'two_qubit': [
+        {
+            'type': 'cx',
+            'name': 'CNOT',
+            'description': 'Controlled-X gate',
+            'parameters': ['control', 'target']
+        },
+        {
+            'type': 'cz',
+            'name': 'Controlled-Z',
+            'description': 'Controlled-Z gate',
+            'parameters': ['control', 'target']
+        }
+    ]
+}
+
+EXAMPLE_CIRCUITS_JSON = orjson.dumps(EXAMPLE_CIRCUITS)
+SUPPORTED_GATES_JSON = orjson.dumps(SUPPORTED_GATES)
+
+@app.route('/api/example-circuits', methods=['GET'])
+def get_example_circuits():
+    """
+    Get predefined example circuits for demonstration
+    """
+    return Response(EXAMPLE_CIRCUITS_JSON, mimetype='application/json')
+
+@app.route('/api/supported-gates', methods=['GET'])
+def get_supported_gates():
+    """
+    Get list of supported quantum gates
+    """
+    return Response(SUPPORTED_GATES_JSON, mimetype='application/json')
+
+@app.errorhandler(404)
+def not_found(error):
+    return ojsonify({'error': 'Endpoint not found'}, 404)
+
+@app.errorhandler(500)
+def internal_error(error):
+    return ojsonify({'error': 'Internal server error'}, 500)
+
+if __name__ == '__main__':
+    print("Starting Quantum State Visualizer API...")
+    print("Available endpoints:")
+    print("  GET  /                     - Health check")
+    print("  POST /api/process-circuit  - Process quantum circuit")
+    print("  GET  /api/example-circuits - Get example circuits")
+    print("  GET  /api/supported-gates  - Get supported gates")
+
+    # The Werkzeug dev server (with reloader/debugger) is opt-in only;
+    # in production run the app under gunicorn instead, e.g.:
+    #   gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5000 app:app
+    # Worker count ~ physical cores, since circuit processing is
+    # CPU-bound NumPy work.
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true')
+    app.run(debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
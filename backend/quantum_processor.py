@@ -1,205 +1,586 @@
-"""
-Quantum State Processor for Quantum State Visualizer
-Handles quantum circuit processing, density matrix calculations, and partial tracing
-"""
-
-import numpy as np
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector, DensityMatrix, partial_trace
-from qiskit_aer import AerSimulator
-from typing import List, Dict, Tuple
-import json
-
-class QuantumStateProcessor:
-    def __init__(self):
-        self.simulator = AerSimulator(method='statevector')
-    
-    def create_circuit_from_json(self, circuit_data: Dict) -> QuantumCircuit:
-        """
-        Create a quantum circuit from JSON representation
-        
-        Args:
-            circuit_data: Dictionary containing circuit information
-                {
-                    "num_qubits": int,
-                    "gates": [
-                        {"type": "h", "qubit": 0},
-                        {"type": "cx", "control": 0, "target": 1},
-                        ...
-                    ]
-                }
-        
-        Returns:
-            QuantumCircuit: The constructed quantum circuit
-        """
-        num_qubits = circuit_data.get('num_qubits', 2)
-        circuit = QuantumCircuit(num_qubits)
-        
-        for gate in circuit_data.get('gates', []):
-            gate_type = gate['type'].lower()
-            
-            if gate_type == 'h':
-                circuit.h(gate['qubit'])
-            elif gate_type == 'x':
-                circuit.x(gate['qubit'])
-            elif gate_type == 'y':
-                circuit.y(gate['qubit'])
-            elif gate_type == 'z':
-                circuit.z(gate['qubit'])
-            elif gate_type == 'cx' or gate_type == 'cnot':
-                circuit.cx(gate['control'], gate['target'])
-            elif gate_type == 'cz':
-                circuit.cz(gate['control'], gate['target'])
-            elif gate_type == 'rx':
-                circuit.rx(gate['angle'], gate['qubit'])
-            elif gate_type == 'ry':
-                circuit.ry(gate['angle'], gate['qubit'])
-            elif gate_type == 'rz':
-                circuit.rz(gate['angle'], gate['qubit'])
-        
-        return circuit
-    
-    def get_statevector(self, circuit: QuantumCircuit) -> np.ndarray:
-        """
-        Get the statevector from a quantum circuit
-        
-        Args:
-            circuit: The quantum circuit
-            
-        Returns:
-            np.ndarray: The statevector
-        """
-        # Use the modern Qiskit approach
-        statevector = Statevector.from_instruction(circuit)
-        return np.array(statevector.data)
-    
-    def calculate_density_matrix(self, statevector: np.ndarray) -> np.ndarray:
-        """
-        Calculate the density matrix from a statevector
-        
-        Args:
-            statevector: The quantum statevector
-            
-        Returns:
-            np.ndarray: The density matrix
-        """
-        return np.outer(statevector, np.conj(statevector))
-    
-    def partial_trace_single_qubit(self, density_matrix: np.ndarray, 
-                                 num_qubits: int, qubit_index: int) -> np.ndarray:
-        """
-        Perform partial trace to isolate a single qubit
-        
-        Args:
-            density_matrix: The full system density matrix
-            num_qubits: Total number of qubits
-            qubit_index: Index of the qubit to isolate
-            
-        Returns:
-            np.ndarray: 2x2 density matrix for the single qubit
-        """
-        # Create list of qubits to trace out (all except the target qubit)
-        qubits_to_trace = [i for i in range(num_qubits) if i != qubit_index]
-        
-        # Convert to Qiskit DensityMatrix for easier partial tracing
-        dm = DensityMatrix(density_matrix)
-        reduced_dm = partial_trace(dm, qubits_to_trace)
-        
-        return reduced_dm.data
-    
-    def density_matrix_to_bloch_vector(self, density_matrix: np.ndarray) -> Tuple[float, float, float]:
-        """
-        Convert a single-qubit density matrix to Bloch sphere coordinates
-        
-        Args:
-            density_matrix: 2x2 density matrix for a single qubit
-            
-        Returns:
-            Tuple[float, float, float]: (x, y, z) coordinates on Bloch sphere
-        """
-        # Pauli matrices
-        sigma_x = np.array([[0, 1], [1, 0]], dtype=complex)
-        sigma_y = np.array([[0, -1j], [1j, 0]], dtype=complex)
-        sigma_z = np.array([[1, 0], [0, -1]], dtype=complex)
-        
-        # Calculate Bloch vector components
-        x = np.real(np.trace(density_matrix @ sigma_x))
-        y = np.real(np.trace(density_matrix @ sigma_y))
-        z = np.real(np.trace(density_matrix @ sigma_z))
-        
-        return (x, y, z)
-    
-    def process_circuit(self, circuit_data: Dict) -> Dict:
-        """
-        Main processing function that takes circuit data and returns Bloch coordinates
-        
-        Args:
-            circuit_data: Dictionary containing circuit information
-            
-        Returns:
-            Dict: Results containing Bloch coordinates for each qubit
-        """
-        try:
-            # Create circuit
-            circuit = self.create_circuit_from_json(circuit_data)
-            num_qubits = circuit.num_qubits
-            
-            # Get statevector
-            statevector = self.get_statevector(circuit)
-            
-            # Calculate full density matrix
-            full_density_matrix = self.calculate_density_matrix(statevector)
-            
-            # Process each qubit
-            results = {
-                'num_qubits': num_qubits,
-                'qubits': []
-            }
-            
-            for qubit_idx in range(num_qubits):
-                # Get reduced density matrix for this qubit
-                reduced_dm = self.partial_trace_single_qubit(
-                    full_density_matrix, num_qubits, qubit_idx
-                )
-                
-                # Convert to Bloch coordinates
-                x, y, z = self.density_matrix_to_bloch_vector(reduced_dm)
-                
-                # Convert complex numbers to real for JSON serialization
-                density_matrix_real = []
-                for row in reduced_dm:
-                    real_row = []
-                    for element in row:
-                        if isinstance(element, complex):
-                            real_row.append([float(element.real), float(element.imag)])
-                        else:
-                            real_row.append([float(element), 0.0])
-                    density_matrix_real.append(real_row)
-                
-                results['qubits'].append({
-                    'index': qubit_idx,
-                    'bloch_coordinates': {'x': float(x), 'y': float(y), 'z': float(z)},
-                    'density_matrix': density_matrix_real  # For debugging
-                })
-            
-            return results
-            
-        except Exception as e:
-            return {'error': str(e)}
-
-# Example usage and testing
-if __name__ == "__main__":
-    processor = QuantumStateProcessor()
-    
-    # Test with a simple Bell state circuit
-    test_circuit = {
-        "num_qubits": 2,
-        "gates": [
-            {"type": "h", "qubit": 0},
-            {"type": "cx", "control": 0, "target": 1}
-        ]
-    }
-    
-    result = processor.process_circuit(test_circuit)
-    print("Test Result:")
+"""
+Quantum State Processor for Quantum State Visualizer
+Handles quantum circuit processing, density matrix calculations, and partial tracing
+"""
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
+import json
+import os
+import threading
+
+# Numba-compiled gate kernels are optional; without them the pure NumPy
+# gate application below is used
+try:
+    import _kernels
+except ImportError:
+    _kernels = None
+
+# Pauli and Hadamard matrices as shared module-level constants; the
+# Paulis double as the X, Y, Z gate matrices. Write-protected so no
+# caller can mutate them accidentally.
+_SIGMA_X = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+_SIGMA_Y = np.array([[0, -1j], [1j, 0]], dtype=np.complex128)
+_SIGMA_Z = np.array([[1, 0], [0, -1]], dtype=np.complex128)
+_HADAMARD = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2)
+
+# Fixed single-qubit gate matrices; rotation gates are built per call
+# since they depend on the angle
+_GATE_MATRICES = {
+    'h': _HADAMARD,
+    'x': _SIGMA_X,
+    'y': _SIGMA_Y,
+    'z': _SIGMA_Z,
+}
+
+# Pauli stack for computing all three Bloch components in one contraction
+_SIGMAS = np.stack([_SIGMA_X, _SIGMA_Y, _SIGMA_Z])
+
+# Rotation-gate matrix builders, keyed by gate type
+_ROTATION_BUILDERS = {
+    'rx': lambda half: np.array([[np.cos(half), -1j * np.sin(half)],
+                                 [-1j * np.sin(half), np.cos(half)]]),
+    'ry': lambda half: np.array([[np.cos(half), -np.sin(half)],
+                                 [np.sin(half), np.cos(half)]], dtype=complex),
+    'rz': lambda half: np.array([[np.exp(-1j * half), 0],
+                                 [0, np.exp(1j * half)]]),
+}
+
+# Dispatch table mapping gate types to Qiskit circuit calls, used by the
+# reference circuit builder; one dict lookup per gate instead of a chain
+# of string comparisons
+_CIRCUIT_DISPATCH = {
+    'h': lambda circuit, gate: circuit.h(gate['qubit']),
+    'x': lambda circuit, gate: circuit.x(gate['qubit']),
+    'y': lambda circuit, gate: circuit.y(gate['qubit']),
+    'z': lambda circuit, gate: circuit.z(gate['qubit']),
+    'rx': lambda circuit, gate: circuit.rx(gate['angle'], gate['qubit']),
+    'ry': lambda circuit, gate: circuit.ry(gate['angle'], gate['qubit']),
+    'rz': lambda circuit, gate: circuit.rz(gate['angle'], gate['qubit']),
+    'cx': lambda circuit, gate: circuit.cx(gate['control'], gate['target']),
+    'cnot': lambda circuit, gate: circuit.cx(gate['control'], gate['target']),
+    'cz': lambda circuit, gate: circuit.cz(gate['control'], gate['target']),
+}
+
+for _matrix in (_SIGMA_X, _SIGMA_Y, _SIGMA_Z, _HADAMARD, _SIGMAS):
+    _matrix.setflags(write=False)
+
+# Shared executor for the embarrassingly-parallel per-qubit reductions;
+# NumPy releases the GIL inside the contractions, so threads scale
+_REDUCTION_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Below this register size the per-qubit work is too small to pay for
+# the thread-submission overhead
+_PARALLEL_QUBIT_THRESHOLD = 3
+
+class QuantumStateProcessor:
+    def __init__(self):
+        # Cache of (subscripts, contraction path) for the partial-trace
+        # einsum, keyed by (num_qubits, qubit_index)
+        self._einsum_cache = {}
+        # Preallocated statevector buffers keyed by qubit count, held in
+        # thread-local storage so gunicorn worker threads don't share them
+        self._scratch = threading.local()
+
+    def _scratch_statevector(self, num_qubits: int) -> np.ndarray:
+        """
+        Return a reusable 2^n statevector buffer initialized to |0...0>
+
+        Buffers are allocated once per (thread, num_qubits) and reset in
+        place on each call, so serving many similar small circuits avoids
+        repeated allocation and garbage collection of the amplitude array.
+        """
+        buffers = getattr(self._scratch, 'buffers', None)
+        if buffers is None:
+            buffers = self._scratch.buffers = {}
+
+        psi = buffers.get(num_qubits)
+        if psi is None:
+            psi = buffers[num_qubits] = np.empty(1 << num_qubits,
+                                                 dtype=np.complex128)
+
+        psi[0] = 1.0
+        psi[1:] = 0.0
+        return psi
+
+    def create_circuit_from_json(self, circuit_data: Dict) -> QuantumCircuit:
+        """
+        Create a Qiskit quantum circuit from JSON representation
+
+        Kept as a validation fallback / reference implementation; the fast
+        path is simulate_statevector, which skips Qiskit entirely.
+
+        Args:
+            circuit_data: Dictionary containing circuit information
+                {
+                    "num_qubits": int,
+                    "gates": [
+                        {"type": "h", "qubit": 0},
+                        {"type": "cx", "control": 0, "target": 1},
+                        ...
+                    ]
+                }
+        
+        Returns:
+            QuantumCircuit: The constructed quantum circuit
+        """
+        num_qubits = circuit_data.get('num_qubits', 2)
+        circuit = QuantumCircuit(num_qubits)
+
+        for gate in circuit_data.get('gates', []):
+            apply = _CIRCUIT_DISPATCH.get(gate['type'].lower())
+            if apply is None:
+                raise ValueError(f"Unsupported gate type: {gate['type']}")
+            apply(circuit, gate)
+
+        return circuit
+    
+    def get_statevector(self, circuit: QuantumCircuit) -> np.ndarray:
+        """
+        Get the statevector from a quantum circuit via Qiskit
+
+        Kept as a validation fallback / reference implementation; the fast
+        path is simulate_statevector, which skips Qiskit entirely.
+
+        Args:
+            circuit: The quantum circuit
+
+        Returns:
+            np.ndarray: The statevector
+        """
+        # Use the modern Qiskit approach
+        statevector = Statevector.from_instruction(circuit)
+        return np.array(statevector.data)
+
+    def apply_gate(self, psi: np.ndarray, gate: Dict) -> np.ndarray:
+        """
+        Apply a single gate to the statevector tensor
+
+        psi has shape (2,)*num_qubits with qubit k on axis
+        (num_qubits - 1 - k), matching Qiskit's little-endian statevector
+        layout. Unknown gate types raise ValueError, mirroring the
+        validation in create_circuit_from_json.
+
+        Args:
+            psi: Statevector reshaped to (2,)*num_qubits
+            gate: Gate dictionary from the circuit JSON
+
+        Returns:
+            np.ndarray: The updated statevector tensor
+        """
+        gate_type = gate['type'].lower()
+
+        matrix = self._single_qubit_matrix(gate_type, gate)
+        if matrix is not None:
+            return self._apply_single_qubit_gate(psi, matrix, gate['qubit'])
+        elif gate_type == 'cx' or gate_type == 'cnot':
+            return self._apply_cx(psi, gate['control'], gate['target'])
+        elif gate_type == 'cz':
+            return self._apply_cz(psi, gate['control'], gate['target'])
+
+        raise ValueError(f"Unsupported gate type: {gate['type']}")
+
+    def _single_qubit_matrix(self, gate_type: str, gate: Dict) -> np.ndarray:
+        """
+        Return the 2x2 matrix for a single-qubit gate type, or None if the
+        type is not a single-qubit gate
+        """
+        matrix = _GATE_MATRICES.get(gate_type)
+        if matrix is not None:
+            return matrix
+
+        builder = _ROTATION_BUILDERS.get(gate_type)
+        if builder is not None:
+            return builder(gate['angle'] / 2)
+
+        return None
+
+    def _fuse_gates(self, gates: List[Dict],
+                  num_qubits: int) -> List[Tuple]:
+        """
+        Fold runs of consecutive single-qubit gates on the same qubit into
+        a single 2x2 matrix
+
+        A pipeline like [H, Rz, H] on one qubit then costs one pass over
+        the 2^n amplitudes instead of three. Matrices multiply in reverse
+        order (later gates on the left); two-qubit gates act as fence
+        boundaries and end any run. Unknown gate types and out-of-range
+        qubit indices raise immediately — the gate kernels index the
+        amplitude buffer without bounds checks, so nothing invalid may
+        reach them.
+
+        Returns:
+            List[Tuple]: ops of the form ('1q', qubit, matrix),
+                ('cx', control, target) or ('cz', control, target)
+        """
+        ops = []
+
+        for gate in gates:
+            gate_type = gate['type'].lower()
+            matrix = self._single_qubit_matrix(gate_type, gate)
+
+            if matrix is not None:
+                qubit = gate['qubit']
+                if not 0 <= qubit < num_qubits:
+                    raise ValueError(
+                        f"Qubit index {qubit} out of range for "
+                        f"{num_qubits}-qubit circuit")
+                if ops and ops[-1][0] == '1q' and ops[-1][1] == qubit:
+                    ops[-1] = ('1q', qubit, matrix @ ops[-1][2])
+                else:
+                    ops.append(('1q', qubit, matrix))
+            elif gate_type in ('cx', 'cnot', 'cz'):
+                control = gate['control']
+                target = gate['target']
+                for qubit in (control, target):
+                    if not 0 <= qubit < num_qubits:
+                        raise ValueError(
+                            f"Qubit index {qubit} out of range for "
+                            f"{num_qubits}-qubit circuit")
+                if control == target:
+                    raise ValueError(
+                        "Control and target qubits must differ for "
+                        f"{gate['type']} gate")
+                ops.append(('cz' if gate_type == 'cz' else 'cx',
+                            control, target))
+            else:
+                raise ValueError(f"Unsupported gate type: {gate['type']}")
+
+        return ops
+
+    def _apply_single_qubit_gate(self, psi: np.ndarray, matrix: np.ndarray,
+                               qubit_index: int) -> np.ndarray:
+        """
+        Apply a 2x2 gate matrix to one qubit of the statevector tensor
+
+        Moves the qubit's axis to the front, unfolds the tensor to a
+        (2, 2^(n-1)) matrix, multiplies by the gate, and folds back, so the
+        gate becomes a single matmul over contiguous data.
+        """
+        num_qubits = psi.ndim
+        if not 0 <= qubit_index < num_qubits:
+            # Out-of-range indices would go negative in the axis
+            # arithmetic below and silently alias another qubit
+            raise ValueError(
+                f"Qubit index {qubit_index} out of range for "
+                f"{num_qubits}-qubit circuit")
+        axis = num_qubits - 1 - qubit_index
+        moved = np.moveaxis(psi, axis, 0)
+        updated = (matrix @ moved.reshape(2, -1)).reshape(moved.shape)
+        return np.moveaxis(updated, 0, axis)
+
+    def _apply_cx(self, psi: np.ndarray, control: int, target: int) -> np.ndarray:
+        """
+        Apply a CNOT gate by swapping amplitude slices in place
+
+        Within the control=1 subspace, CX just exchanges the target qubit's
+        |0> and |1> slices, so no 4x4 matrix or matmul is needed: two slice
+        copies touch exactly the 2^(n-1) affected amplitudes.
+        """
+        num_qubits = psi.ndim
+        c_axis = num_qubits - 1 - control
+        t_axis = num_qubits - 1 - target
+
+        idx_10 = [slice(None)] * num_qubits
+        idx_10[c_axis], idx_10[t_axis] = 1, 0
+        idx_11 = [slice(None)] * num_qubits
+        idx_11[c_axis], idx_11[t_axis] = 1, 1
+        idx_10, idx_11 = tuple(idx_10), tuple(idx_11)
+
+        tmp = psi[idx_10].copy()
+        psi[idx_10] = psi[idx_11]
+        psi[idx_11] = tmp
+        return psi
+
+    def _apply_cz(self, psi: np.ndarray, control: int, target: int) -> np.ndarray:
+        """
+        Apply a CZ gate by negating the control=1, target=1 slice in place
+
+        CZ is diagonal, so it reduces to flipping the sign of the
+        2^(n-2) amplitudes where both qubits are |1>.
+        """
+        num_qubits = psi.ndim
+        idx_11 = [slice(None)] * num_qubits
+        idx_11[num_qubits - 1 - control] = 1
+        idx_11[num_qubits - 1 - target] = 1
+        psi[tuple(idx_11)] *= -1
+        return psi
+
+    def simulate_statevector(self, circuit_data: Dict) -> np.ndarray:
+        """
+        Simulate a circuit directly on a NumPy amplitude array
+
+        Avoids Qiskit's per-gate object construction and repeated internal
+        reshaping: the statevector is reshaped to (2,)*num_qubits once and
+        every gate is applied in place on that tensor. When the Numba
+        kernels are available the gates run as compiled, parallel loops on
+        the flat amplitude array instead.
+
+        Args:
+            circuit_data: Dictionary containing circuit information
+
+        Returns:
+            np.ndarray: The final statevector of length 2^num_qubits
+        """
+        num_qubits = circuit_data.get('num_qubits', 2)
+        gates = circuit_data.get('gates', [])
+
+        if _kernels is not None:
+            return self._simulate_statevector_numba(num_qubits, gates)
+
+        psi = self._scratch_statevector(num_qubits).reshape((2,) * num_qubits)
+
+        for op in self._fuse_gates(gates, num_qubits):
+            if op[0] == '1q':
+                psi = self._apply_single_qubit_gate(psi, op[2], op[1])
+            elif op[0] == 'cx':
+                psi = self._apply_cx(psi, op[1], op[2])
+            else:
+                psi = self._apply_cz(psi, op[1], op[2])
+
+        return psi.reshape(-1)
+
+    def _simulate_statevector_numba(self, num_qubits: int,
+                                  gates: List[Dict]) -> np.ndarray:
+        """
+        Simulate a circuit with the compiled kernels from _kernels.py
+
+        The statevector stays a flat complex128 array throughout; bit k of
+        an amplitude's index is the state of qubit k, so the kernels
+        address qubits with plain bit masks and update in place.
+        """
+        psi = self._scratch_statevector(num_qubits)
+
+        for op in self._fuse_gates(gates, num_qubits):
+            if op[0] == '1q':
+                _kernels.apply_1q(psi, op[1], op[2].astype(np.complex128))
+            elif op[0] == 'cx':
+                _kernels.apply_cx(psi, op[1], op[2])
+            else:
+                _kernels.apply_cz(psi, op[1], op[2])
+
+        return psi
+    
+    def reduced_density_matrix(self, statevector: np.ndarray,
+                             num_qubits: int, qubit_index: int) -> np.ndarray:
+        """
+        Compute the reduced density matrix of a single qubit directly from
+        the statevector, without ever forming the full 2^n x 2^n density matrix
+
+        The statevector is viewed as a rank-n tensor of shape (2,)*n. Qubit k
+        lives on axis (num_qubits - 1 - k) because of Qiskit's little-endian
+        ordering. The whole reduction is a single einsum contracting psi with
+        its conjugate on every axis except the target qubit's (for example
+        'abc,adc->bd' for qubit axis 1 of a 3-qubit state), so it runs in
+        O(2^n) time and memory instead of O(4^n). The subscripts and the
+        optimized contraction path are cached per (num_qubits, qubit_index).
+
+        Args:
+            statevector: The quantum statevector
+            num_qubits: Total number of qubits
+            qubit_index: Index of the qubit to isolate
+
+        Returns:
+            np.ndarray: 2x2 density matrix for the single qubit
+        """
+        psi = statevector.reshape((2,) * num_qubits)
+        axis = num_qubits - 1 - qubit_index
+
+        cached = self._einsum_cache.get((num_qubits, qubit_index))
+        if cached is None:
+            # Contract every axis except the target qubit's, which stays
+            # free in both operands: rho_ij = sum psi[..i..] * conj(psi[..j..])
+            letters = 'abcdefghijklmnopqrstuvwxyz'
+            ket = letters[:num_qubits]
+            bra = ket[:axis] + letters[num_qubits] + ket[axis + 1:]
+            subscripts = f'{ket},{bra}->{ket[axis]}{bra[axis]}'
+            path = np.einsum_path(subscripts, psi, np.conj(psi),
+                                  optimize='greedy')[0]
+            cached = (subscripts, path)
+            self._einsum_cache[(num_qubits, qubit_index)] = cached
+
+        subscripts, path = cached
+        return np.einsum(subscripts, psi, np.conj(psi), optimize=path)
+
+    def bloch_vectors_from_statevector(self, statevector: np.ndarray,
+                                     num_qubits: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute Bloch vectors and reduced states for all qubits in a
+        single pass over the statevector
+
+        |psi|^2 is computed once and marginalized along each qubit's axis to
+        get the diagonals, and one slice contraction per qubit gives the
+        off-diagonals, so the Python/NumPy dispatch overhead of a separate
+        reduction per qubit is amortized across the whole register.
+
+        Each reduced density matrix is Hermitian, so it is returned as the
+        three real numbers (rho_00, Re rho_01, Im rho_01) that fully
+        determine it instead of four complex entries.
+
+        Args:
+            statevector: The quantum statevector
+            num_qubits: Total number of qubits
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]:
+                (num_qubits, 3) array of Bloch (x, y, z) coordinates and
+                (num_qubits, 3) array of (rho_00, Re rho_01, Im rho_01)
+                reduced-state triples
+        """
+        psi = statevector.reshape((2,) * num_qubits)
+        abs2 = np.abs(psi) ** 2
+
+        # Marginal probabilities (rho_00, rho_11) and off-diagonals (rho_01)
+        # for every qubit; axis (num_qubits - 1 - k) holds qubit k
+        def reduce_qubit(qubit_idx):
+            axis = num_qubits - 1 - qubit_idx
+            other_axes = tuple(a for a in range(num_qubits) if a != axis)
+            marginal = np.add.reduce(abs2, axis=other_axes)
+            slices = np.moveaxis(psi, axis, 0)
+            off = np.tensordot(slices[0], np.conj(slices[1]),
+                               axes=num_qubits - 1)
+            return marginal, off
+
+        probs = np.empty((num_qubits, 2))
+        offs = np.empty(num_qubits, dtype=complex)
+
+        if num_qubits >= _PARALLEL_QUBIT_THRESHOLD:
+            # The reductions are independent per qubit, so fan them out
+            # over the shared thread pool
+            reductions = _REDUCTION_EXECUTOR.map(reduce_qubit,
+                                                 range(num_qubits))
+        else:
+            reductions = map(reduce_qubit, range(num_qubits))
+
+        for qubit_idx, (marginal, off) in enumerate(reductions):
+            probs[qubit_idx] = marginal
+            offs[qubit_idx] = off
+
+        bloch = np.column_stack((2 * offs.real,
+                                 -2 * offs.imag,
+                                 probs[:, 0] - probs[:, 1]))
+
+        reduced_states = np.column_stack((probs[:, 0], offs.real, offs.imag))
+
+        return bloch, reduced_states
+    
+    def density_matrix_to_bloch_vector(self, density_matrix: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Convert a single-qubit density matrix to Bloch sphere coordinates
+        
+        Args:
+            density_matrix: 2x2 density matrix for a single qubit
+            
+        Returns:
+            Tuple[float, float, float]: (x, y, z) coordinates on Bloch sphere
+        """
+        # One batched contraction against the stacked Paulis gives all
+        # three traces Tr(rho sigma_k) in a single call
+        x, y, z = np.einsum('ij,kji->k', density_matrix, _SIGMAS).real
+
+        return (x, y, z)
+    
+    def process_circuit(self, circuit_data: Dict,
+                      include_density: bool = True) -> Dict:
+        """
+        Main processing function that takes circuit data and returns Bloch coordinates
+
+        Args:
+            circuit_data: Dictionary containing circuit information
+            include_density: Whether to include the 2x2 reduced density
+                matrices in the output (the frontend only needs the Bloch
+                coordinates)
+
+        Returns:
+            Dict: Results containing Bloch coordinates for each qubit
+        """
+        try:
+            num_qubits = circuit_data.get('num_qubits', 2)
+
+            # Get statevector via the direct NumPy simulation
+            statevector = self.simulate_statevector(circuit_data)
+
+            # Single qubit: the state is pure and already "reduced", so the
+            # Bloch vector and density matrix come straight from the two
+            # amplitudes with no partial-trace machinery at all
+            if num_qubits == 1:
+                a, b = statevector
+                # .item() yields native Python scalars without the
+                # float() C-API round-trip
+                prob_0 = (abs(a) ** 2).item()
+                prob_1 = (abs(b) ** 2).item()
+                rho_01 = (a * np.conj(b)).item()
+
+                qubit_result = {
+                    'index': 0,
+                    'bloch_coordinates': {
+                        'x': 2 * rho_01.real,
+                        'y': -2 * rho_01.imag,
+                        'z': prob_0 - prob_1
+                    }
+                }
+                if include_density:
+                    qubit_result['density_matrix'] = [
+                        [[prob_0, 0.0], [rho_01.real, rho_01.imag]],
+                        [[rho_01.real, -rho_01.imag], [prob_1, 0.0]]
+                    ]  # For debugging
+
+                return {'num_qubits': 1, 'qubits': [qubit_result]}
+
+            # Reduce all qubits in one batched pass
+            bloch, reduced_states = self.bloch_vectors_from_statevector(
+                statevector, num_qubits
+            )
+
+            # Build JSON output per qubit
+            results = {
+                'num_qubits': num_qubits,
+                'qubits': []
+            }
+
+            # tolist() converts every element to a native Python float in
+            # one C-level walk, avoiding per-element float() casts
+            bloch_rows = bloch.tolist()
+            state_rows = reduced_states.tolist()
+
+            for qubit_idx in range(num_qubits):
+                qubit_result = {
+                    'index': qubit_idx,
+                    'bloch_coordinates': dict(zip('xyz', bloch_rows[qubit_idx]))
+                }
+
+                if include_density:
+                    # Reconstruct the full 2x2 matrix from the Hermitian
+                    # triple as [real, imag] pairs for JSON serialization
+                    p0, re01, im01 = state_rows[qubit_idx]
+                    qubit_result['density_matrix'] = [
+                        [[p0, 0.0], [re01, im01]],
+                        [[re01, -im01], [1.0 - p0, 0.0]]
+                    ]  # For debugging
+
+                results['qubits'].append(qubit_result)
+
+            return results
+            
+        except Exception as e:
+            return {'error': str(e)}
+
+# Example usage and testing
+if __name__ == "__main__":
+    processor = QuantumStateProcessor()
+    
+    # Test with a simple Bell state circuit
+    test_circuit = {
+        "num_qubits": 2,
+        "gates": [
+            {"type": "h", "qubit": 0},
+            {"type": "cx", "control": 0, "target": 1}
+        ]
+    }
+    
+    result = processor.process_circuit(test_circuit)
+    print("Test Result:")
     print(json.dumps(result, indent=2))
\ No newline at end of file